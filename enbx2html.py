@@ -1,130 +1,216 @@
 import os
 import shutil
-import xml.etree.ElementTree as ET
 from pathlib import Path
 import re
 import argparse
 import zipfile
 import tempfile
+import json
+import string
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-class EnbxConverter:
-    def __init__(self, source_dir, output_dir, file_title=None):
-        self.source_dir = Path(source_dir)
-        self.output_dir = Path(output_dir)
-        self.file_title = file_title
-        self.resources_dir = self.source_dir / "Resources"
-        self.slides_dir = self.source_dir / "Slides"
-        
-        self.board_info = {}
-        self.slide_order = []
-        self.resource_map = {}
-        self.slide_file_map = {}
-        self.metadata = {}
-        
-        # XML Namespaces (if any, usually strictly required for ElementTree if defined in root)
-        # In the XMLs we saw, Board.xml didn't have xmlns.
-        # [Content_Types].xml had one.
-        # We'll handle namespaces dynamically if needed, or ignore them.
+# Prefer the libxml2-backed lxml parser; fall back to the standard library.
+try:
+    from lxml import etree as ET
 
-    def parse_metadata(self):
-        doc_xml = self.source_dir / "Document.xml"
-        if not doc_xml.exists():
-            print("Document.xml not found!")
-            return
+    # libxml2 rejects text nodes over 10 MB unless huge_tree is set; ElementTree has no such limit
+    def parse_xml(source):
+        return ET.parse(xml_input(source), ET.XMLParser(huge_tree=True))
 
-        try:
-            tree = ET.parse(doc_xml)
-            root = tree.getroot()
-            self.metadata['Name'] = root.find('Name').text if root.find('Name') is not None else "Unknown"
-            self.metadata['Creator'] = root.find('Creator').text if root.find('Creator') is not None else "Unknown"
-            self.metadata['CreatedDateTime'] = root.find('CreatedDateTime').text if root.find('CreatedDateTime') is not None else "Unknown"
-            self.metadata['ModifiedDateTime'] = root.find('ModifiedDateTime').text if root.find('ModifiedDateTime') is not None else "Unknown"
-            print(f"Document Metadata: {self.metadata}")
-        except Exception as e:
-            print(f"Error parsing Document.xml: {e}")
+    def iterparse_xml(source, events):
+        return ET.iterparse(xml_input(source), events=events, huge_tree=True)
 
-    def parse_board(self):
-        board_xml = self.source_dir / "Board.xml"
-        if not board_xml.exists():
-            print("Board.xml not found!")
-            return
+    def iter_children(node, tag):
+        return node.iterchildren(tag)
+except ImportError:
+    import xml.etree.ElementTree as ET
 
-        tree = ET.parse(board_xml)
-        root = tree.getroot()
-        
-        self.board_info['width'] = float(root.find('SlideWidth').text)
-        self.board_info['height'] = float(root.find('SlideHeight').text)
-        
-        slides_node = root.find('Slides')
-        if slides_node is not None:
-            for item in slides_node.findall('Item'):
-                self.slide_order.append(item.text)
-        
-        print(f"Board parsed: {self.board_info}, {len(self.slide_order)} slides found.")
+    def parse_xml(source):
+        return ET.parse(xml_input(source))
 
-    def parse_references(self):
-        ref_xml = self.source_dir / "Reference.xml"
-        if not ref_xml.exists():
-            print("Reference.xml not found!")
-            return
+    def iterparse_xml(source, events):
+        return ET.iterparse(xml_input(source), events=events)
 
-        tree = ET.parse(ref_xml)
-        root = tree.getroot()
-        
-        rels = root.find('Relationships')
-        if rels is not None:
-            for rel in rels.findall('Relationship'):
-                res_id = rel.find('Id').text
-                target = rel.find('Target').text
-                self.resource_map[res_id] = target.replace('\\', '/')
-        
-        print(f"References parsed: {len(self.resource_map)} resources found.")
+    def iter_children(node, tag):
+        return node.iterfind(tag)
 
-    def map_slides(self):
-        if not self.slides_dir.exists():
-            print("Slides directory not found!")
-            return
+# EasiNote alignment values -> CSS
+_V_ALIGN = {"Center": "center", "Bottom": "flex-end"}
+_H_ALIGN = {"Center": "center", "Right": "right"}
 
-        for xml_file in self.slides_dir.glob("*.xml"):
-            try:
-                tree = ET.parse(xml_file)
-                root = tree.getroot()
-                slide_id = root.find('Id').text
-                self.slide_file_map[slide_id] = xml_file
-            except Exception as e:
-                print(f"Error parsing {xml_file}: {e}")
-        
-        print(f"Mapped {len(self.slide_file_map)} slide files.")
+_SPAN_TMPL = '<span style="{0}">{1}</span>'.format
 
-    def copy_resources(self):
-        if self.source_dir.resolve() == self.output_dir.resolve():
-            print("Source and Output are the same directory. Skipping resource copy.")
-            return
+_BACKSLASH_TO_SLASH = str.maketrans('\\', '/')
 
-        dest_res = self.output_dir / "Resources"
-        if dest_res.exists():
-            shutil.rmtree(dest_res)
-        
-        if self.resources_dir.exists():
-            shutil.copytree(self.resources_dir, dest_res)
-            print("Resources copied.")
+# Alpha byte -> CSS alpha, same values as int(aa, 16) / 255.0
+_ALPHA = [i / 255.0 for i in range(256)]
+
+# HTML escaping for run text; str.translate does it in one C-level pass
+_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+COPY_WORKERS = 8
+
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Decks whose total uncompressed size is below this are parsed straight from the archive
+IN_MEMORY_ZIP_LIMIT = 50 * 1024 * 1024
+
+# Written next to an extracted deck so re-runs can skip unzipping
+EXTRACT_MANIFEST = ".enbx_manifest.json"
+
+# Slides render at roughly 36 MiB of XML per second, while starting a spawn-based
+# process pool costs 100-150 ms; below this much slide XML the pool is slower
+PARALLEL_SLIDE_BYTES = 16 * 1024 * 1024
+
+def xml_input(source):
+    # Paths are parsed from disk; bytes are XML members of a deck held in memory
+    return io.BytesIO(source) if isinstance(source, bytes) else str(source)
+
+def is_deck_xml(name):
+    return name.lower().endswith('.xml') and not name.startswith('Resources/')
+
+def child_map(elem):
+    # First child per tag, matching what elem.find(tag) would return
+    children = {}
+    for child in elem:
+        children.setdefault(child.tag, child)
+    return children
+
+def child_float(children, tag, default=0):
+    child = children.get(tag)
+    return float(child.text) if child is not None else default
+
+def find_path(node, first, second):
+    # Two plain finds avoid ElementPath's parser for "First/Second" paths
+    child = node.find(first)
+    return child.find(second) if child is not None else None
+
+def node_text(node):
+    return node.text if node is not None else None
+
+def text_run_key(run):
+    # Everything a run's rendered <span> depends on; None for runs with no text
+    find = run.find
+    text_content = find("Text").text
+    if not text_content:
+        return None
+
+    font_weight = find("FontWeight")
+    return (
+        node_text(find("FontSize")),
+        node_text(find_path(run, "FontFamily", "Source")),
+        node_text(find_path(run, "Foreground", "ColorBrush")),
+        font_weight is not None and font_weight.text == "Bold",
+        text_content,
+    )
+
+def parse_argb(color_hex):
+    # "#AARRGGBB" -> 4 bytes; None for anything else (bytes.fromhex skips spaces, so check the length)
+    if not (color_hex.startswith("#") and len(color_hex) == 9):
+        return None
+    try:
+        argb = bytes.fromhex(color_hex[1:])
+    except ValueError:
+        return None
+    return argb if len(argb) == 4 else None
+
+def render_text_run(font_size, font_family, color_hex, bold, text_content):
+    # Style mapping
+    style = []
+    if font_size is not None:
+        style.append(f"font-size: {font_size}px; ")
+    if font_family is not None:
+        style.append(f"font-family: '{font_family}', sans-serif; ")
+    if color_hex is not None:
+        # Hex ARGB to CSS RGBA? 
+        # EasiNote uses #AARRGGBB usually. CSS wants #RRGGBB or rgba().
+        argb = parse_argb(color_hex)
+        if argb is not None:
+            style.append(f"color: rgba({argb[1]},{argb[2]},{argb[3]},{_ALPHA[argb[0]]}); ")
         else:
-            print("No Resources folder to copy.")
+            style.append(f"color: {color_hex}; ")
+    if bold:
+        style.append("font-weight: bold; ")
 
-    def generate_html(self):
-        if not self.output_dir.exists():
-            self.output_dir.mkdir(parents=True)
-        
-        # HTML Header
-        html_content = f"""
+    return _SPAN_TMPL("".join(style), text_content.translate(_ESCAPE))
+
+def copy_tree_parallel(src, dst):
+    # Like shutil.copytree, but file copies are I/O bound so run them on a thread pool
+    futures = []
+
+    def walk(src_dir, dst_dir):
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as it:
+            for entry in it:
+                target = os.path.join(dst_dir, entry.name)
+                if entry.is_dir():
+                    walk(entry.path, target)
+                else:
+                    futures.append(executor.submit(shutil.copy2, entry.path, target))
+
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        walk(src, dst)
+        for future in futures:
+            future.result()
+
+_WINDOWS_ILLEGAL = str.maketrans(':<>|"?*', '_______')
+
+def member_target(dest_dir, filename):
+    # Same path preparation as ZipFile.extract: no drives, "." or "..", and Windows-safe names
+    arcname = filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [x for x in arcname.split(os.path.sep) if x not in ('', os.path.curdir, os.path.pardir)]
+    if os.path.sep == '\\':
+        parts = [x.translate(_WINDOWS_ILLEGAL).rstrip('.') for x in parts]
+        parts = [x for x in parts if x]
+    return os.path.normpath(os.path.join(dest_dir, *parts))
+
+def extract_zip_parallel(zip_path, dest_dir, members=None):
+    dest_dir = os.fspath(dest_dir)
+    
+    # Create every directory up front, so workers only ever write files
+    files = []
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if members is not None and info.filename not in members:
+                continue
+            target = member_target(dest_dir, info.filename)
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+            elif target != os.path.normpath(dest_dir):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                files.append((info, target))
+    
+    # ZipFile handles are not thread-safe, so each worker opens its own
+    def extract_batch(batch):
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            for info, target in batch:
+                with zip_ref.open(info) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+    
+    # Deal the largest members out first to balance the batches
+    files.sort(key=lambda item: item[0].file_size, reverse=True)
+    batches = [files[i::EXTRACT_WORKERS] for i in range(EXTRACT_WORKERS)]
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as executor:
+        list(executor.map(extract_batch, [b for b in batches if b]))
+
+# Page shell around the rendered slides, built once at import
+_HTML_HEAD = string.Template("""
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{self.file_title if self.file_title else self.metadata.get('Name', 'EasiNote Export')}</title>
+    <title>$title</title>
     <style>
-        body {{
+        body {
             margin: 0;
             padding: 0;
             background-color: #333;
@@ -134,16 +220,16 @@ class EnbxConverter:
             height: 100vh;
             overflow: hidden;
             font-family: "Microsoft YaHei", sans-serif;
-        }}
-        #container {{
+        }
+        #container {
             position: relative;
-            width: {self.board_info.get('width', 1280)}px;
-            height: {self.board_info.get('height', 720)}px;
+            width: ${width}px;
+            height: ${height}px;
             background-color: white;
             overflow: hidden;
             box-shadow: 0 0 20px rgba(0,0,0,0.5);
-        }}
-        .slide {{
+        }
+        .slide {
             position: absolute;
             top: 0;
             left: 0;
@@ -151,36 +237,36 @@ class EnbxConverter:
             height: 100%;
             display: none;
             background-size: 100% 100%;
-        }}
-        .slide.active {{
+        }
+        .slide.active {
             display: block;
-        }}
-        .element {{
+        }
+        .element {
             position: absolute;
             transform-origin: 50% 50%;
             white-space: pre-wrap; /* Preserve formatting */
             display: flex; /* For alignment */
             flex-direction: column;
-        }}
-        .element img {{
+        }
+        .element img {
             width: 100%;
             height: 100%;
             display: block;
-        }}
-        .nav-buttons {{
+        }
+        .nav-buttons {
             position: fixed;
             bottom: 20px;
             left: 50%;
             transform: translateX(-50%);
             z-index: 1000;
-        }}
-        .info-button {{
+        }
+        .info-button {
             position: fixed;
             top: 20px;
             right: 20px;
             z-index: 1000;
-        }}
-        button {{
+        }
+        button {
             padding: 10px 20px;
             font-size: 16px;
             cursor: pointer;
@@ -188,13 +274,13 @@ class EnbxConverter:
             border: none;
             border-radius: 5px;
             margin: 0 5px;
-        }}
-        button:hover {{
+        }
+        button:hover {
             background: white;
-        }}
+        }
         
         /* Modal Styles */
-        .modal {{
+        .modal {
             display: none; 
             position: fixed; 
             z-index: 2000; 
@@ -204,8 +290,8 @@ class EnbxConverter:
             height: 100%; 
             overflow: auto; 
             background-color: rgba(0,0,0,0.4); 
-        }}
-        .modal-content {{
+        }
+        .modal-content {
             background-color: #fefefe;
             margin: 15% auto; 
             padding: 20px;
@@ -213,70 +299,43 @@ class EnbxConverter:
             width: 50%; 
             border-radius: 10px;
             box-shadow: 0 4px 8px 0 rgba(0,0,0,0.2);
-        }}
-        .close {{
+        }
+        .close {
             color: #aaa;
             float: right;
             font-size: 28px;
             font-weight: bold;
-        }}
+        }
         .close:hover,
-        .close:focus {{
+        .close:focus {
             color: black;
             text-decoration: none;
             cursor: pointer;
-        }}
-        .info-table {{
+        }
+        .info-table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 10px;
-        }}
-        .info-table td, .info-table th {{
+        }
+        .info-table td, .info-table th {
             border: 1px solid #ddd;
             padding: 8px;
-        }}
-        .info-table tr:nth-child(even){{background-color: #f2f2f2;}}
-        .info-table th {{
+        }
+        .info-table tr:nth-child(even){background-color: #f2f2f2;}
+        .info-table th {
             padding-top: 12px;
             padding-bottom: 12px;
             text-align: left;
             background-color: #4CAF50;
             color: white;
-        }}
+        }
     </style>
 </head>
 <body>
     <div id="container">
-"""
-        
-        # Generate Slides
-        for index, slide_id in enumerate(self.slide_order):
-            if slide_id not in self.slide_file_map:
-                print(f"Warning: Slide ID {slide_id} not found in mapped files.")
-                continue
-            
-            slide_file = self.slide_file_map[slide_id]
-            slide_html = self.render_slide(slide_file, index == 0)
-            html_content += slide_html
-        
-        # HTML Footer & Scripts
-        metadata_rows = ""
-        # Localization and formatting
-        key_map = {
-            'Name': '文档名称',
-            'Creator': '作者',
-            'CreatedDateTime': '创建时间',
-            'ModifiedDateTime': '上次修改时间'
-        }
-        
-        for key, label in key_map.items():
-            val = self.metadata.get(key, "")
-            if val:
-                if key == 'Creator':
-                    val = f'<a href="https://k.seewo.com/personalPage/{val}" target="_blank">{val}</a>'
-                metadata_rows += f"<tr><td>{label}</td><td>{val}</td></tr>"
+""")
 
-        html_content += f"""
+_HTML_FOOT = string.Template("""
     </div>
     <div class="nav-buttons">
         <button onclick="prevSlide()">上一页</button>
@@ -292,7 +351,7 @@ class EnbxConverter:
             <span class="close" onclick="closeInfo()">&times;</span>
             <h2>文档信息</h2>
             <table class="info-table">
-                {metadata_rows}
+                $metadata_rows
             </table>
         </div>
     </div>
@@ -302,65 +361,273 @@ class EnbxConverter:
         const slides = document.querySelectorAll('.slide');
         const modal = document.getElementById("infoModal");
         
-        function showSlide(n) {{
+        function showSlide(n) {
             slides[currentSlide].classList.remove('active');
             currentSlide = (n + slides.length) % slides.length;
             slides[currentSlide].classList.add('active');
-        }}
+        }
         
-        function nextSlide() {{
-            if (currentSlide < slides.length - 1) {{
+        function nextSlide() {
+            if (currentSlide < slides.length - 1) {
                 showSlide(currentSlide + 1);
-            }}
-        }}
+            }
+        }
         
-        function prevSlide() {{
-            if (currentSlide > 0) {{
+        function prevSlide() {
+            if (currentSlide > 0) {
                 showSlide(currentSlide - 1);
-            }}
-        }}
+            }
+        }
         
-        function showInfo() {{
+        function showInfo() {
             modal.style.display = "block";
-        }}
+        }
         
-        function closeInfo() {{
+        function closeInfo() {
             modal.style.display = "none";
-        }}
+        }
         
-        window.onclick = function(event) {{
-            if (event.target == modal) {{
+        window.onclick = function(event) {
+            if (event.target == modal) {
                 modal.style.display = "none";
-            }}
-        }}
+            }
+        }
         
         // Keyboard navigation
-        document.addEventListener('keydown', (e) => {{
-            if (e.key === 'ArrowRight' || e.key === 'ArrowDown' || e.key === ' ') {{
+        document.addEventListener('keydown', (e) => {
+            if (e.key === 'ArrowRight' || e.key === 'ArrowDown' || e.key === ' ') {
                 nextSlide();
-            }} else if (e.key === 'ArrowLeft' || e.key === 'ArrowUp') {{
+            } else if (e.key === 'ArrowLeft' || e.key === 'ArrowUp') {
                 prevSlide();
-            }}
-        }});
+            }
+        });
     </script>
 </body>
 </html>
-"""
+""")
+
+class EnbxConverter:
+    def __init__(self, source_dir, output_dir, file_title=None, xml_members=None):
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir)
+        self.file_title = file_title
+        # Archive name -> bytes when the deck's XML is read from memory instead of source_dir
+        self.xml_members = xml_members
+        self.resources_dir = self.source_dir / "Resources"
+        self.slides_dir = self.source_dir / "Slides"
+        
+        self.board_info = {}
+        self.slide_order = []
+        self.resource_map = {}
+        # "id://<res_id>" -> target, so slide sources resolve with a single lookup
+        self.image_source_map = {}
+        self.slide_file_map = {}
+        self.metadata = {}
+        # Rendered <span> per text_run_key(); headers and footers repeat across slides
+        self.run_cache = {}
+        
+        # XML Namespaces (if any, usually strictly required for ElementTree if defined in root)
+        # In the XMLs we saw, Board.xml didn't have xmlns.
+        # [Content_Types].xml had one.
+        # We'll handle namespaces dynamically if needed, or ignore them.
+
+    def xml_source(self, name):
+        if self.xml_members is not None:
+            return self.xml_members.get(name)
+        path = self.source_dir / name
+        return str(path) if path.exists() else None
+
+    def parse_metadata(self):
+        doc_xml = self.xml_source("Document.xml")
+        if doc_xml is None:
+            print("Document.xml not found!")
+            return
+
+        try:
+            tree = parse_xml(doc_xml)
+            children = child_map(tree.getroot())
+            for key in ('Name', 'Creator', 'CreatedDateTime', 'ModifiedDateTime'):
+                child = children.get(key)
+                self.metadata[key] = child.text if child is not None else "Unknown"
+            print(f"Document Metadata: {self.metadata}")
+        except Exception as e:
+            print(f"Error parsing Document.xml: {e}")
+
+    def parse_board(self):
+        board_xml = self.xml_source("Board.xml")
+        if board_xml is None:
+            print("Board.xml not found!")
+            return
+
+        tree = parse_xml(board_xml)
+        children = child_map(tree.getroot())
+        
+        self.board_info['width'] = float(children['SlideWidth'].text)
+        self.board_info['height'] = float(children['SlideHeight'].text)
+        
+        slides_node = children.get('Slides')
+        if slides_node is not None:
+            for item in slides_node.findall('Item'):
+                self.slide_order.append(item.text)
+        
+        print(f"Board parsed: {self.board_info}, {len(self.slide_order)} slides found.")
+
+    def parse_references(self):
+        ref_xml = self.xml_source("Reference.xml")
+        if ref_xml is None:
+            print("Reference.xml not found!")
+            return
+
+        # Stream relationships and detach each one once read, so Reference.xml never builds up a tree.
+        # Like root.find('Relationships').findall('Relationship'), only direct children of the first
+        # root-level <Relationships> count.
+        depth = 0
+        container = None
+        top = None  # currently open child of the root
+        for event, elem in iterparse_xml(ref_xml, ('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 2:
+                    top = elem
+                    if container is None and elem.tag == 'Relationships':
+                        container = elem
+                continue
+            depth -= 1
+            if elem is container:
+                break
+            if depth != 2 or top is not container:
+                continue
+            if elem.tag == 'Relationship':
+                res_id = elem.find('Id').text
+                target = elem.find('Target').text.translate(_BACKSLASH_TO_SLASH)
+                self.resource_map[res_id] = target
+                self.image_source_map["id://" + res_id] = target
+            container.remove(elem)
+        
+        print(f"References parsed: {len(self.resource_map)} resources found.")
+
+    def map_slides(self):
+        # (name, source) pairs; source is a file path, or the member bytes for an in-memory deck
+        if self.xml_members is not None:
+            slide_sources = [
+                (name, data) for name, data in self.xml_members.items()
+                if name.startswith("Slides/") and "/" not in name[len("Slides/"):]
+            ]
+        else:
+            if not self.slides_dir.exists():
+                print("Slides directory not found!")
+                return
+
+            with os.scandir(self.slides_dir) as it:
+                slide_sources = [(e.path, e.path) for e in it if e.is_file() and e.name.lower().endswith('.xml')]
+        
+        for xml_file, source in slide_sources:
+            try:
+                slide_id = self.read_slide_id(source)
+                if slide_id is None:
+                    print(f"Error parsing {xml_file}: Id not found")
+                    continue
+                self.slide_file_map[slide_id] = source
+            except Exception as e:
+                print(f"Error parsing {xml_file}: {e}")
         
-        with open(self.output_dir / "index.html", "w", encoding="utf-8") as f:
-            f.write(html_content)
+        print(f"Mapped {len(self.slide_file_map)} slide files.")
+
+    def read_slide_id(self, xml_file):
+        # Stream the slide and stop at the root-level <Id>, instead of building the whole tree
+        depth = 0
+        for event, elem in iterparse_xml(xml_file, ('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if elem.tag == 'Id':
+                    return elem.text
+                elem.clear()
+        return None
+
+    def copy_resources(self):
+        if self.source_dir.resolve() == self.output_dir.resolve():
+            print("Source and Output are the same directory. Skipping resource copy.")
+            return
+
+        dest_res = self.output_dir / "Resources"
+        if dest_res.exists():
+            shutil.rmtree(dest_res)
+        
+        if self.resources_dir.exists():
+            copy_tree_parallel(self.resources_dir, dest_res)
+            print("Resources copied.")
+        else:
+            print("No Resources folder to copy.")
+
+    def generate_html(self):
+        if not self.output_dir.exists():
+            self.output_dir.mkdir(parents=True)
+        
+        # HTML Header
+        header = _HTML_HEAD.substitute(
+            title=self.file_title if self.file_title else self.metadata.get('Name', 'EasiNote Export'),
+            width=self.board_info.get('width', 1280),
+            height=self.board_info.get('height', 720),
+        )
+        parts = [header]
+        
+        # Generate Slides
+        slide_files = []
+        active_flags = []
+        for index, slide_id in enumerate(self.slide_order):
+            if slide_id not in self.slide_file_map:
+                print(f"Warning: Slide ID {slide_id} not found in mapped files.")
+                continue
+            
+            slide_files.append(self.slide_file_map[slide_id])
+            active_flags.append(index == 0)
+        
+        parts.extend(self.render_slides(slide_files, active_flags))
+        
+        # HTML Footer & Scripts
+        metadata_rows = []
+        # Localization and formatting
+        key_map = {
+            'Name': '文档名称',
+            'Creator': '作者',
+            'CreatedDateTime': '创建时间',
+            'ModifiedDateTime': '上次修改时间'
+        }
+        
+        for key, label in key_map.items():
+            val = self.metadata.get(key, "")
+            if val:
+                if key == 'Creator':
+                    val = f'<a href="https://k.seewo.com/personalPage/{val}" target="_blank">{val}</a>'
+                metadata_rows.append(f"<tr><td>{label}</td><td>{val}</td></tr>")
+        metadata_rows = "".join(metadata_rows)
+
+        parts.append(_HTML_FOOT.substitute(metadata_rows=metadata_rows))
+        # Encode part by part instead of joining the whole document first
+        with open(self.output_dir / "index.html", "wb", buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.writelines(part.encode("utf-8") for part in parts)
         print("HTML generation complete.")
 
     def resolve_image_source(self, source_text):
-        if not source_text or not source_text.startswith("id://"):
-            return None
-        res_id = source_text.replace("id://", "")
-        if res_id in self.resource_map:
-            return self.resource_map[res_id]
-        return None
+        return self.image_source_map.get(source_text)
+
+    def render_slides(self, slide_files, active_flags):
+        # Slides are independent, so large decks are rendered across processes
+        workers = min(os.cpu_count() or 1, len(slide_files))
+        if workers > 1 and slide_bytes(slide_files) >= PARALLEL_SLIDE_BYTES:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker, initargs=(self.image_source_map,)) as executor:
+                    return list(executor.map(render_slide_in_worker, slide_files, active_flags))
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                print(f"Parallel rendering unavailable ({e}), rendering serially.")
+        
+        return [self.render_slide(f, a) for f, a in zip(slide_files, active_flags)]
 
     def render_slide(self, xml_file, is_active):
-        tree = ET.parse(xml_file)
+        tree = parse_xml(xml_file)
         root = tree.getroot()
         
         active_class = " active" if is_active else ""
@@ -377,43 +644,48 @@ class EnbxConverter:
                     if img_path:
                         style = f'style="background-image: url(\'{img_path}\');"'
         
-        html = f'<div class="slide{active_class}" {style}>\n'
+        parts = [f'<div class="slide{active_class}" {style}>\n']
         
         elements_node = root.find("Elements")
         if elements_node is not None:
             for elem in elements_node:
-                html += self.render_element(elem)
+                # lxml also yields comments and processing instructions
+                if not isinstance(elem.tag, str):
+                    continue
+                parts.append(self.render_element(elem))
                 
-        html += '</div>\n'
-        return html
+        parts.append('</div>\n')
+        return "".join(parts)
 
     def render_element(self, elem):
+        children = child_map(elem)
+        
         # Common properties
-        x = float(elem.find('X').text) if elem.find('X') is not None else 0
-        y = float(elem.find('Y').text) if elem.find('Y') is not None else 0
-        w = float(elem.find('Width').text) if elem.find('Width') is not None else 0
-        h = float(elem.find('Height').text) if elem.find('Height') is not None else 0
-        rot = float(elem.find('Rotation').text) if elem.find('Rotation') is not None else 0
+        x = child_float(children, 'X')
+        y = child_float(children, 'Y')
+        w = child_float(children, 'Width')
+        h = child_float(children, 'Height')
+        rot = child_float(children, 'Rotation')
         
-        style = f"left: {x}px; top: {y}px; width: {w}px; height: {h}px;"
+        style = [f"left: {x}px; top: {y}px; width: {w}px; height: {h}px;"]
         if rot != 0:
-            style += f" transform: rotate({rot}deg);"
+            style.append(f" transform: rotate({rot}deg);")
             
         content = ""
         
         tag = elem.tag
         
         # Handle Text
-        if tag == "Text" or (tag == "ActivityItem" and elem.find("Text") is not None):
+        if tag == "Text" or (tag == "ActivityItem" and "Text" in children):
             # For ActivityItem, the Text node is a child
-            text_root = elem if tag == "Text" else elem.find("Text")
-            rich_text = text_root.find("RichText")
+            text_root = elem if tag == "Text" else children["Text"]
+            rich_text = children.get("RichText") if tag == "Text" else text_root.find("RichText")
             if rich_text is not None:
                 content = self.render_rich_text(rich_text)
                 
                 # Activity Item Background
                 if tag == "ActivityItem":
-                    bg_node = elem.find("Background")
+                    bg_node = children.get("Background")
                     if bg_node is not None:
                         img_brush = bg_node.find("ImageBrush")
                         if img_brush is not None:
@@ -422,89 +694,68 @@ class EnbxConverter:
                                 img_path = self.resolve_image_source(src_node.text)
                                 if img_path:
                                     # Add background image to style
-                                    style += f" background-image: url('{img_path}'); background-size: 100% 100%;"
+                                    style.append(f" background-image: url('{img_path}'); background-size: 100% 100%;")
 
         # Handle Image/Picture
         # If there is a direct Source tag in the element (like ActivityItem had), use it if no other content
         if not content:
-            source_node = elem.find("Source")
+            source_node = children.get("Source")
             if source_node is not None:
                 img_path = self.resolve_image_source(source_node.text)
                 if img_path:
                     content = f'<img src="{img_path}" draggable="false">'
         
-        return f'<div class="element" style="{style}">{content}</div>\n'
+        return f'<div class="element" style="{"".join(style)}">{content}</div>\n'
 
     def render_rich_text(self, rich_text_node):
-        html = ""
-        
         # Vertical Alignment
         vert_align = rich_text_node.find("VerticalTextAlignment")
         justify_content = "flex-start"
         if vert_align is not None:
-            if vert_align.text == "Center":
-                justify_content = "center"
-            elif vert_align.text == "Bottom":
-                justify_content = "flex-end"
+            justify_content = _V_ALIGN.get(vert_align.text, "flex-start")
         
         # Need to wrap inner content in a div that handles alignment
-        inner_html = ""
+        inner_html = []
         
         text_lines = rich_text_node.find("TextLines")
         if text_lines is not None:
-            for line in text_lines.findall("TextLine"):
-                line_html = '<div style="display: block; width: 100%;">' # Line container
-                
+            for line in iter_children(text_lines, "TextLine"):
                 # Horizontal Alignment
                 text_align = line.find("TextAlignment")
                 text_align_style = "left"
                 if text_align is not None:
-                    if text_align.text == "Center":
-                        text_align_style = "center"
-                    elif text_align.text == "Right":
-                        text_align_style = "right"
+                    text_align_style = _H_ALIGN.get(text_align.text, "left")
                 
-                line_html = f'<div style="text-align: {text_align_style}; line-height: 1.2;">'
+                inner_html.append(f'<div style="text-align: {text_align_style}; line-height: 1.2;">')
 
                 text_runs = line.find("TextRuns")
                 if text_runs is not None:
-                    for run in text_runs.findall("TextRun"):
-                        text_content = run.find("Text").text
-                        if not text_content:
+                    for run in iter_children(text_runs, "TextRun"):
+                        key = text_run_key(run)
+                        if key is None:
                             continue
-                            
-                        # Style mapping
-                        font_size = run.find("FontSize")
-                        font_family_node = run.find("FontFamily/Source")
-                        foreground_node = run.find("Foreground/ColorBrush")
-                        font_weight = run.find("FontWeight")
-                        
-                        style = ""
-                        if font_size is not None:
-                            style += f"font-size: {font_size.text}px; "
-                        if font_family_node is not None:
-                            style += f"font-family: '{font_family_node.text}', sans-serif; "
-                        if foreground_node is not None:
-                            # Hex ARGB to CSS RGBA? 
-                            # EasiNote uses #AARRGGBB usually. CSS wants #RRGGBB or rgba().
-                            color_hex = foreground_node.text
-                            if color_hex.startswith("#") and len(color_hex) == 9:
-                                a = int(color_hex[1:3], 16) / 255.0
-                                r = int(color_hex[3:5], 16)
-                                g = int(color_hex[5:7], 16)
-                                b = int(color_hex[7:9], 16)
-                                style += f"color: rgba({r},{g},{b},{a}); "
-                            else:
-                                style += f"color: {color_hex}; "
-                        if font_weight is not None and font_weight.text == "Bold":
-                            style += "font-weight: bold; "
-                            
-                        line_html += f'<span style="{style}">{text_content}</span>'
+                        span = self.run_cache.get(key)
+                        if span is None:
+                            span = self.run_cache[key] = render_text_run(*key)
+                        inner_html.append(span)
                 
-                line_html += "</div>"
-                inner_html += line_html
+                inner_html.append("</div>")
         
-        return f'<div style="display: flex; flex-direction: column; justify-content: {justify_content}; height: 100%;">{inner_html}</div>'
+        return f'<div style="display: flex; flex-direction: column; justify-content: {justify_content}; height: 100%;">{"".join(inner_html)}</div>'
+
+def slide_bytes(slide_files):
+    return sum(len(f) if isinstance(f, bytes) else os.path.getsize(f) for f in slide_files)
+
+# Per-process converter used by ProcessPoolExecutor workers
+_worker_converter = None
+
+def init_render_worker(image_source_map):
+    global _worker_converter
+    _worker_converter = EnbxConverter(".", ".")
+    _worker_converter.image_source_map = image_source_map
+
+def render_slide_in_worker(xml_file, is_active):
+    return _worker_converter.render_slide(xml_file, is_active)
 
 def process_enbx(input_path, output_dir=None, show_info=False):
     input_path = Path(input_path).resolve()
@@ -528,24 +779,58 @@ def process_enbx(input_path, output_dir=None, show_info=False):
         final_output_dir = input_path.parent / default_output_name
 
     source_dir = input_path
+    xml_members = None
     
     if is_zip:
         print(f"Unzipping {input_path}...")
-        # If we extract directly to output_dir, we don't need a temp dir unless we want to separate raw from html
-        # But enbx structure is root-level. 
-        # Strategy: Extract to output_dir. The HTML will be generated there too.
+        # Strategy: unpack into output_dir, next to the generated HTML. Large decks are fully
+        # extracted; small decks only get their non-XML files (Resources) written, and their
+        # XML is parsed from memory, so output_dir is then not a complete extracted deck.
         if not final_output_dir.exists():
             final_output_dir.mkdir(parents=True)
         
         with zipfile.ZipFile(input_path, 'r') as zip_ref:
-            zip_ref.extractall(final_output_dir)
+            infos = zip_ref.infolist()
+            # Small decks keep their XML in memory; only the remaining files go to disk
+            if sum(info.file_size for info in infos) < IN_MEMORY_ZIP_LIMIT:
+                xml_members = {info.filename: zip_ref.read(info) for info in infos if is_deck_xml(info.filename)}
+        
+        manifest_path = final_output_dir / EXTRACT_MANIFEST
+        zip_stat = input_path.stat()
+        manifest = {
+            "zip_path": str(input_path),
+            "zip_mtime": zip_stat.st_mtime,
+            "zip_size": zip_stat.st_size,
+            "in_memory": xml_members is not None,
+        }
+        
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                up_to_date = json.load(f) == manifest
+        except (OSError, ValueError):
+            up_to_date = False
+        
+        if up_to_date:
+            print("Extracted files are up to date. Skipping unzip.")
+        else:
+            # Drop the old manifest first so a failed extraction is never taken as up to date
+            manifest_path.unlink(missing_ok=True)
+            members = None
+            if xml_members is not None:
+                members = {info.filename for info in infos if info.filename not in xml_members}
+            extract_zip_parallel(input_path, final_output_dir, members)
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
         
         source_dir = final_output_dir
     
-    print(f"Converting from {source_dir} to {final_output_dir}...")
+    if xml_members is not None:
+        print(f"Converting from {input_path} (in memory) to {final_output_dir}...")
+    else:
+        print(f"Converting from {source_dir} to {final_output_dir}...")
     
     file_title = input_path.stem
-    converter = EnbxConverter(source_dir, final_output_dir, file_title=file_title)
+    converter = EnbxConverter(source_dir, final_output_dir, file_title=file_title, xml_members=xml_members)
     converter.parse_metadata()
     
     if show_info:
@@ -561,6 +846,7 @@ def process_enbx(input_path, output_dir=None, show_info=False):
     print(f"Done! Output at: {final_output_dir / 'index.html'}")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description="Convert ENBX (EasiNote) files to HTML5.")
     parser.add_argument("input_file", help="Path to .enbx file or extracted directory")
     parser.add_argument("-o", "--output", help="Output directory (optional)")